@@ -0,0 +1,52 @@
+# Benchmark: Compression CPU Cost vs. Bytes Saved
+# Compresses `GET /items`-shaped JSON bodies of several sizes with every encoding
+# available here (gzip, plus brotli / zstd when installed) at a few levels, and
+# reports the compressed size, the bytes saved and the CPU time it took.
+# Use it to pick `INVENTORY_COMPRESSION_LEVELS` and `INVENTORY_COMPRESSION_MIN_SIZE`.
+#
+# Usage: python bench_compression.py [rows ...]
+
+import json
+import sys
+import time
+
+from response_compression import AVAILABLE_ENCODINGS, compress
+
+ROW_COUNTS = [20, 1_000, 100_000]
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 11], "zstd": [1, 3, 19]}
+# Repeat small bodies so each measurement runs long enough to be meaningful
+MIN_SECONDS = 0.2
+
+
+def make_body(rows):
+    items = [{"name": f"Item {i} ({['red', 'green', 'blue'][i % 3]})", "quantity": i % 1000, "id": i + 1} for i in range(rows)]
+    return json.dumps(items, separators=(",", ":")).encode()
+
+
+def cpu_time(body, encoding, level):
+    """
+    CPU seconds per compression of `body` (median of a few runs).
+    """
+    runs = []
+    while sum(runs) < MIN_SECONDS or len(runs) < 3:
+        start = time.process_time()
+        compressed = compress(body, encoding, level)
+        runs.append(time.process_time() - start)
+    return sorted(runs)[len(runs) // 2], len(compressed)
+
+
+if __name__ == "__main__":
+    row_counts = [int(arg) for arg in sys.argv[1:]] or ROW_COUNTS
+    print(f"Encodings available: {', '.join(AVAILABLE_ENCODINGS)}")
+    print(f"{'rows':>7} | {'bytes':>9} | {'encoding':>8} | {'level':>5} | {'compressed':>10} | {'saved':>6} | {'cpu ms':>8} | {'MB/s':>7} | {'KB saved/cpu ms':>15}")
+    print("-" * 100)
+    for rows in row_counts:
+        body = make_body(rows)
+        for encoding in AVAILABLE_ENCODINGS:
+            for level in LEVELS[encoding]:
+                seconds, size = cpu_time(body, encoding, level)
+                saved = len(body) - size
+                print(
+                    f"{rows:>7} | {len(body):>9} | {encoding:>8} | {level:>5} | {size:>10} | {saved / len(body):>5.1%} | "
+                    f"{seconds * 1000:>8.3f} | {len(body) / seconds / 1e6:>7.1f} | {saved / 1024 / (seconds * 1000):>15.1f}"
+                )
@@ -0,0 +1,75 @@
+# Benchmark: Full List vs. Streaming Export
+# Fetches every item once through `GET /items` (the whole list built in memory)
+# and once through `GET /items/export` in each format, and reports the time, the
+# response size and the peak Python memory allocated while serving it (tracemalloc,
+# which also slows everything down, so compare times with each other only).
+# The app is called directly over ASGI, discarding the body as it is sent, so
+# only the server side is measured. It runs against a throwaway database.
+# `arrow` and `parquet` are skipped unless pyarrow is installed.
+#
+# Usage: python bench_export.py [rows]
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench_json import load_app, fill_table
+
+ROWS = 200_000
+
+
+async def measure(app, path):
+    """
+    (seconds, body bytes, peak bytes allocated) for one GET of `path`.
+    """
+    sent = 0
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message["status"]
+        elif message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    tracemalloc.start()
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, sent, peak
+
+
+async def main(module):
+    paths = ["/items"] + [
+        f"/items/export?format={fmt}" for fmt in module.EXPORT_FORMATS if module.format_available(fmt)
+    ]
+    async with module.lifespan(module.app):
+        print(f"{'request':>30} | {'seconds':>7} | {'MB sent':>7} | {'peak MB':>7}")
+        print("-" * 62)
+        for path in paths:
+            elapsed, sent, peak = await measure(module.app, path)
+            print(f"{path:>30} | {elapsed:>7.2f} | {sent / 1e6:>7.1f} | {peak / 1e6:>7.1f}")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    # Every request would be a cache hit otherwise
+    os.environ["INVENTORY_LIST_CACHE_SIZE"] = "0"
+    os.environ["INVENTORY_CHANGE_LOG_COMPACT_INTERVAL"] = "0"
+    module = load_app(tempfile.mkdtemp())
+    fill_table(rows)
+    print(f"{rows} rows\n")
+    asyncio.run(main(module))
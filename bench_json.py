@@ -0,0 +1,79 @@
+# Benchmark: Default vs Fast JSON Responses
+# Compares how long `GET /items` takes on 10k and 100k rows with FastAPI's default
+# response handling (validate against `response_model`, then `jsonable_encoder` +
+# `json.dumps`) and with `FastJSONResponse` (rows dumped straight to bytes).
+# It runs the inventory app in-process against a throwaway database, so `db.db`
+# is never touched. The list response cache is turned off, since every request
+# after the first would be a cache hit.
+#
+# Usage: python bench_json.py [rows ...]
+
+import importlib.util
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from migrations import migrate
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inventory-application.py")
+ROW_COUNTS = [10_000, 100_000]
+REPEAT = 5
+
+
+def load_app(workdir):
+    """
+    Import inventory-application.py from inside `workdir`, so its `./db.db` lives there.
+    """
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+    spec = importlib.util.spec_from_file_location("inventory_application", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fill_table(rows):
+    migrate()
+    conn = sqlite3.connect("db.db")
+    conn.execute("DELETE FROM items")
+    conn.executemany(
+        "INSERT INTO items (name, quantity) VALUES (?, ?)",
+        ((f"Item {i}", i % 1000) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_requests(client):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        response = client.get("/items")
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return statistics.median(timings), len(response.content)
+
+
+if __name__ == "__main__":
+    row_counts = [int(arg) for arg in sys.argv[1:]] or ROW_COUNTS
+    os.environ["INVENTORY_LIST_CACHE_SIZE"] = "0"
+    app_module = load_app(tempfile.mkdtemp())
+
+    print(f"JSON encoder: {app_module.dump_json.__module__}")
+    print(f"{'rows':>8} | {'default (ms)':>12} | {'fast (ms)':>10} | {'speedup':>7} | {'bytes':>10}")
+    print("-" * 60)
+    for rows in row_counts:
+        fill_table(rows)
+        results = {}
+        for mode, endpoints in (("default", set()), ("fast", {"read_items"})):
+            app_module.FAST_JSON_ENDPOINTS = endpoints
+            with TestClient(app_module.app) as client:
+                results[mode] = time_requests(client)
+        default_time, size = results["default"]
+        fast_time, _ = results["fast"]
+        print(f"{rows:>8} | {default_time * 1000:>12.1f} | {fast_time * 1000:>10.1f} | {default_time / fast_time:>6.1f}x | {size:>10}")
@@ -0,0 +1,195 @@
+# Load-Testing Benchmark for the Inventory Application
+# Grown out of `verify_db.py`: instead of running the CRUD cycle once, it keeps
+# many concurrent clients running a weighted mix of operations for a fixed
+# duration and reports throughput and p50/p95/p99 latency per endpoint.
+#
+# The app is either driven in-process (ASGI transport against a throwaway
+# database, the default) or over HTTP against a running server (`--url`).
+#
+# Usage:
+#   python bench_load.py --concurrency 32 --duration 10
+#   python bench_load.py --url http://127.0.0.1:8001 --mix create=1,read=8,list=1
+#   python bench_load.py --json results.json --baseline previous.json
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from bench_json import load_app
+
+DEFAULT_MIX = "create=1,list=1,read=6,update=1,patch=1,delete=1"
+
+# Endpoint label used in the report for each operation
+ENDPOINTS = {
+    "create": "POST /items",
+    "list": "GET /items",
+    "read": "GET /items/{item_id}",
+    "update": "PUT /items/{item_id}",
+    "patch": "PATCH /items/{item_id}",
+    "delete": "DELETE /items/{item_id}",
+}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown operation in --mix: {name} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class Benchmark:
+    def __init__(self, client, mix, list_limit):
+        self.client = client
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.list_limit = list_limit
+        self.item_ids = []
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def seed(self, count):
+        response = await self.client.post("/items/bulk", json=[
+            {"name": f"Bench Item {i}", "quantity": i} for i in range(count)
+        ])
+        response.raise_for_status()
+        self.item_ids.extend(response.json()["ids"])
+
+    def pick_id(self):
+        return random.choice(self.item_ids) if self.item_ids else 0
+
+    async def run_operation(self, operation):
+        if operation == "create":
+            return await self.client.post("/items", json={"name": "Bench Item", "quantity": 1})
+        if operation == "list":
+            return await self.client.get("/items", params={"limit": self.list_limit})
+        if operation == "read":
+            return await self.client.get(f"/items/{self.pick_id()}")
+        if operation == "update":
+            return await self.client.put(f"/items/{self.pick_id()}", json={"name": "Bench Item", "quantity": 2})
+        if operation == "patch":
+            return await self.client.patch(f"/items/{self.pick_id()}", json={"quantity": 3})
+        if operation == "delete":
+            item_id = self.pick_id()
+            if item_id in self.item_ids:
+                self.item_ids.remove(item_id)
+            return await self.client.delete(f"/items/{item_id}")
+
+    async def worker(self, deadline):
+        while time.perf_counter() < deadline:
+            operation = random.choices(self.operations, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self.run_operation(operation)
+            except httpx.HTTPError:
+                self.errors[operation] += 1
+                continue
+            self.latencies[operation].append(time.perf_counter() - start)
+            # A 404 just means another worker deleted the item first
+            if response.status_code >= 400 and response.status_code != 404:
+                self.errors[operation] += 1
+            elif operation == "create":
+                self.item_ids.append(response.json()["id"])
+
+    async def run(self, concurrency, duration):
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(self.worker(deadline) for _ in range(concurrency)))
+
+    def results(self, duration):
+        endpoints = {}
+        for operation, timings in self.latencies.items():
+            timings.sort()
+            endpoints[ENDPOINTS[operation]] = {
+                "requests": len(timings),
+                "errors": self.errors[operation],
+                "throughput_rps": round(len(timings) / duration, 1),
+                "p50_ms": round(percentile(timings, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(timings, 0.99) * 1000, 2),
+            }
+        total = sum(endpoint["requests"] for endpoint in endpoints.values())
+        return {"total_requests": total, "throughput_rps": round(total / duration, 1), "endpoints": endpoints}
+
+
+def print_report(results, baseline=None):
+    print(f"\nTotal: {results['total_requests']} requests, {results['throughput_rps']} req/s")
+    header = f"{'endpoint':<26} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'errors':>6}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in sorted(results["endpoints"].items()):
+        print(f"{name:<26} | {stats['throughput_rps']:>8} | {stats['p50_ms']:>8} | {stats['p95_ms']:>8} | {stats['p99_ms']:>8} | {stats['errors']:>6}")
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous:
+            deltas = [
+                f"{key} {(stats[key] - previous[key]) / previous[key] * 100:+.1f}%"
+                for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms") if previous[key]
+            ]
+            print(f"{'  vs baseline':<26} | " + ", ".join(deltas))
+
+
+async def main(args):
+    mix = parse_mix(args.mix)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+        lifespan = None
+    else:
+        app = load_app(tempfile.mkdtemp()).app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+        # The ASGI transport does not run the lifespan, so connect the database ourselves
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    try:
+        async with client:
+            benchmark = Benchmark(client, mix, args.list_limit)
+            await benchmark.seed(args.seed)
+            print(f"Running {args.concurrency} workers for {args.duration}s, mix: {args.mix}")
+            await benchmark.run(args.concurrency, args.duration)
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    results = benchmark.results(args.duration)
+    results["config"] = {
+        "url": args.url or "in-process",
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": args.mix,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the inventory application.")
+    parser.add_argument("--url", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1000, help="Items created before the run starts")
+    parser.add_argument("--list-limit", type=int, default=100, help="Page size used by the list operation")
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    parser.add_argument("--baseline", help="Compare against results previously written with --json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,92 @@
+# Benchmark: Per-Request Query Compilation vs. Precompiled Statements
+# For the queries of `read_item`, `update_item`, `patch_item` and `delete_item`:
+# 1. "compile": the time to turn a query into SQL plus arguments inside `databases`,
+#    building a new SQLAlchemy expression each time (as before) vs. binding values
+#    to a precompiled `Statement`.
+#    With `INVENTORY_DATA_ACCESS=raw` it is `RawSQLiteDatabase`'s compile instead.
+# 2. "end to end": `fetch_one` of one item against a throwaway SQLite database,
+#    both ways, to show how much of a real query that overhead is.
+#
+# Usage: python bench_statements.py [iterations]
+
+import asyncio
+import sys
+import tempfile
+import time
+
+import sqlalchemy
+
+from bench_json import load_app, fill_table
+
+ITERATIONS = 10_000
+
+
+def per_call_us(function, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        function(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def compile_benchmarks(app, iterations):
+    items = app.items
+    if app.RAW_DATA_ACCESS:
+        compile_query = lambda query: app.database._compile(query, None)
+    else:
+        # An unacquired backend connection is enough to compile queries
+        compile_query = app.database._backend.connection()._compile
+    queries = {
+        "read_item": (
+            lambda i: items.select().where(items.c.id == i),
+            lambda i: app.GET_ITEM.bind(item_id=i),
+        ),
+        "update_item": (
+            lambda i: items.update().where(items.c.id == i).values(
+                name="Item", quantity=i, version=items.c.version + 1
+            ).returning(items),
+            lambda i: app.UPDATE_ITEM.bind(item_id=i, new_name="Item", new_quantity=i),
+        ),
+        "patch_item": (
+            lambda i: items.update().where(items.c.id == i).values(
+                quantity=i, version=items.c.version + 1
+            ).returning(items),
+            lambda i: app.PATCH_ITEM[("quantity",)].bind(item_id=i, new_quantity=i),
+        ),
+        "delete_item": (
+            lambda i: items.delete().where(items.c.id == i).returning(items.c.id),
+            lambda i: app.DELETE_ITEM.bind(item_id=i),
+        ),
+    }
+    print(f"{'handler':>12} | {'build+compile (us)':>18} | {'bind (us)':>9} | {'saved (us)':>10}")
+    print("-" * 60)
+    for handler, (build, bind) in queries.items():
+        # Warm up, so the precompiled side has compiled once already
+        compile_query(bind(1))
+        dynamic = per_call_us(lambda i: compile_query(build(i)), iterations)
+        cached = per_call_us(lambda i: compile_query(bind(i)), iterations)
+        print(f"{handler:>12} | {dynamic:>18.1f} | {cached:>9.1f} | {dynamic - cached:>10.1f}")
+
+
+async def end_to_end(app, iterations):
+    items = app.items
+    # The app's own startup, so the database is opened exactly as when serving
+    async with app.lifespan(app.app):
+        for label, make_query in (
+            ("expression", lambda i: items.select().where(items.c.id == i)),
+            ("statement", lambda i: app.GET_ITEM.bind(item_id=i)),
+        ):
+            start = time.perf_counter()
+            for i in range(iterations):
+                await app.read_database.fetch_one(make_query(i % 1000 + 1))
+            elapsed = time.perf_counter() - start
+            print(f"{label:>12} | {elapsed / iterations * 1e6:>8.1f} us per fetch_one")
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    app = load_app(tempfile.mkdtemp())
+    fill_table(1000)
+    print(f"SQLAlchemy {sqlalchemy.__version__}, {iterations} iterations\n")
+    compile_benchmarks(app, iterations)
+    print()
+    asyncio.run(end_to_end(app, iterations))
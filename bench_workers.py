@@ -0,0 +1,79 @@
+# Benchmark: Scaling the Inventory Application Across Worker Processes
+# Starts `uvicorn inventory-application:app --workers N` in multi-worker mode
+# (INVENTORY_MULTI_WORKER=1) against a throwaway database for each N, runs
+# `bench_load.py` against it and reports throughput, p99 latency and errors.
+# Any "database is locked" failure would show up in the errors column.
+#
+# Usage: python bench_workers.py [--workers 1 2 4] [--duration 10] [--concurrency 64]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_until_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/stats") as response:
+                if response.getcode() == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise SystemExit(f"Server at {url} did not start within {timeout}s")
+
+
+def run(workers, args):
+    url = f"http://127.0.0.1:{args.port}"
+    workdir = tempfile.mkdtemp()
+    env = {**os.environ, "INVENTORY_MULTI_WORKER": "1"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "inventory-application:app", "--app-dir", HERE,
+         "--port", str(args.port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    try:
+        wait_until_ready(url)
+        results_path = os.path.join(workdir, "results.json")
+        subprocess.run(
+            [sys.executable, os.path.join(HERE, "bench_load.py"), "--url", url,
+             "--concurrency", str(args.concurrency), "--duration", str(args.duration),
+             "--mix", args.mix, "--json", results_path],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(results_path) as f:
+            return json.load(f)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure throughput with 1..N uvicorn workers.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--mix", default="create=1,list=1,read=6,update=1,patch=1,delete=1")
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}, mix: {args.mix}")
+    print(f"{'workers':>7} | {'req/s':>8} | {'scaling':>7} | {'worst p99 ms':>12} | {'errors':>6}")
+    print("-" * 53)
+    baseline = None
+    for workers in args.workers:
+        results = run(workers, args)
+        throughput = results["throughput_rps"]
+        baseline = baseline or throughput
+        endpoints = results["endpoints"].values()
+        worst_p99 = max(endpoint["p99_ms"] for endpoint in endpoints)
+        errors = sum(endpoint["errors"] for endpoint in endpoints)
+        print(f"{workers:>7} | {throughput:>8} | {throughput / baseline:>6.2f}x | {worst_p99:>12} | {errors:>6}")
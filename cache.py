@@ -0,0 +1,88 @@
+# In-Process LRU Cache
+# A small bounded cache with least-recently-used eviction and an optional
+# time-to-live, used by the inventory application to avoid hitting SQLite for
+# hot lookups. It is meant to be used from a single event loop, so no locking.
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded key/value cache.
+    - max_size: Maximum number of entries; the least recently used one is evicted first.
+      A size of 0 disables the cache.
+    - ttl: Seconds an entry stays valid, or None to keep entries until evicted.
+
+    `generation` is bumped by every write (`set`/`delete`/`clear`). A reader that
+    loaded a value from the database can pass the generation it saw before the
+    query to `set(..., generation=...)`, and the value is only stored if no
+    write happened in between.
+    """
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """
+        The stored value, even if expired, without counting a hit or miss or
+        refreshing its position.
+        """
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        if self.max_size <= 0:
+            return
+        if generation is not None:
+            if generation != self.generation:
+                # A write happened while the value was being loaded, it may be stale
+                return
+        else:
+            self.generation += 1
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
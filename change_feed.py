@@ -0,0 +1,134 @@
+# Item Change Feed
+# Pushes every committed write of the inventory app to subscribers (the
+# `/items/stream` Server-Sent Events endpoint and the `/items/ws` WebSocket),
+# so dashboards can follow changes instead of polling `GET /items`.
+# - Every event gets the next sequence number, starting at 1.
+# - The last `history_size` events are kept, so a subscriber that reconnects with
+#   the last sequence it saw gets what it missed (`subscribe(since=...)`). If that
+#   is no longer possible (too old, or from before a restart) it gets a `reset`
+#   event instead, telling it to reload the full list and carry on from there.
+# - Each subscriber has a bounded queue. `publish()` never waits: a subscriber
+#   whose queue is full is a slow consumer and is dropped (its queue is emptied
+#   and ends with `DROPPED`); it can reconnect and resume from its last sequence.
+# Like `LRUCache` it is only used from the event loop, so no locking. It only sees
+# writes made by this process.
+
+import asyncio
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Set
+
+# Queue markers ending a subscription
+DROPPED = "dropped"
+CLOSED = "closed"
+
+
+class Subscription:
+    """
+    One subscriber's queue. `get()` returns the next event (a dict), or `DROPPED` /
+    `CLOSED` once the subscription has ended.
+    """
+    def __init__(self, feed: "ChangeFeed", queue_size: int):
+        self.feed = feed
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size + 1)
+        self.queue_size = queue_size
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        The next event; None if nothing arrived within `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def offer(self, event: dict) -> bool:
+        """
+        Queue `event`, or end the subscription with `DROPPED` if the queue is full.
+        One slot beyond `queue_size` is kept free for the end marker.
+        """
+        if self.queue.qsize() < self.queue_size:
+            self.queue.put_nowait(event)
+            return True
+        self.end(DROPPED)
+        return False
+
+    def end(self, marker: str):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(marker)
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+
+class ChangeFeed:
+    """
+    - history_size: Number of past events kept for resuming subscribers.
+    - queue_size: Events a subscriber may fall behind before it is dropped.
+    """
+    def __init__(self, history_size: int = 10_000, queue_size: int = 1000):
+        self.sequence = 0
+        self.history: Deque[dict] = deque(maxlen=history_size)
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscription] = set()
+        self.dropped = 0
+
+    def publish(self, event_type: str, item_id: int, item: Optional[dict] = None) -> dict:
+        self.sequence += 1
+        event = {"seq": self.sequence, "type": event_type, "id": item_id, "item": item}
+        self.history.append(event)
+        for subscription in list(self.subscribers):
+            if not subscription.offer(event):
+                self.subscribers.discard(subscription)
+                self.dropped += 1
+        return event
+
+    def subscribe(self, since: Optional[int] = None) -> Subscription:
+        """
+        A new subscription receiving every event published from now on, preceded
+        by the events after sequence `since` if given. If those can't all be
+        replayed, it starts with a `reset` event carrying the current sequence.
+        """
+        subscription = Subscription(self, self.queue_size)
+        if since is not None:
+            missed = self.missed_since(since)
+            if missed is None or len(missed) > self.queue_size:
+                subscription.queue.put_nowait({"seq": self.sequence, "type": "reset", "id": None, "item": None})
+            else:
+                for event in missed:
+                    subscription.queue.put_nowait(event)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def missed_since(self, since: int) -> Optional[List[dict]]:
+        """
+        The kept events after sequence `since`, or None if some are gone or `since`
+        was never published (e.g. it is from before a restart).
+        """
+        if since == self.sequence:
+            return []
+        oldest = self.history[0]["seq"] if self.history else self.sequence + 1
+        if since < 0 or since > self.sequence or since + 1 < oldest:
+            return None
+        return list(islice(self.history, since + 1 - oldest, None))
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+    def close(self):
+        """
+        End every subscription, e.g. at shutdown, so open streams finish.
+        """
+        for subscription in self.subscribers:
+            subscription.end(CLOSED)
+        self.subscribers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sequence": self.sequence,
+            "history": len(self.history),
+            "subscribers": len(self.subscribers),
+            "dropped": self.dropped,
+            "queue_size": self.queue_size,
+        }
@@ -0,0 +1,36 @@
+# Snapshot Consistency Check
+# Asks a running inventory app started with `INVENTORY_SNAPSHOT=1` to compare its
+# in-memory snapshot with the database (`GET /snapshot/check`), prints the
+# differences and exits with status 1 if there are any.
+# An item written at the very moment of the check can show up once; a difference
+# that is still there on a second run is real.
+#
+# Usage: python check_snapshot.py [BASE_URL]
+
+import json
+import sys
+import urllib.error
+import urllib.request
+
+BASE_URL = "http://127.0.0.1:8000"
+
+
+def check(base_url):
+    try:
+        with urllib.request.urlopen(f"{base_url}/snapshot/check") as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        raise SystemExit(f"Status: {e.code} {e.read().decode('utf-8')}")
+    except urllib.error.URLError as e:
+        raise SystemExit(f"Error: {e.reason}")
+
+
+if __name__ == "__main__":
+    result = check(sys.argv[1] if len(sys.argv) > 1 else BASE_URL)
+    print(f"Checked {result['checked']} items")
+    for key, label in (("missing", "Missing from the snapshot"), ("extra", "Only in the snapshot"), ("different", "Different")):
+        if result[key]:
+            print(f"{label} ({len(result[key])}): {', '.join(map(str, result[key][:50]))}")
+    if result["consistent"]:
+        print("Snapshot is consistent with the database.")
+    sys.exit(0 if result["consistent"] else 1)
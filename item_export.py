@@ -0,0 +1,150 @@
+# Streaming Item Export
+# Encoders for `GET /items/export`, which streams the whole `items` table without
+# ever holding more than one batch of rows in memory:
+# - The app reads the table in fixed-size keyset batches (`id > last id LIMIT n`)
+#   and passes them in as an async iterator of lists of item dicts.
+# - `encode()` turns them into `csv`, `ndjson`, `arrow` (Arrow IPC stream) or
+#   `parquet` bytes, yielding output as soon as each batch is encoded.
+# CSV and NDJSON are text, so the compression middleware gzips (or brotli/zstd)
+# them on the fly. Arrow and Parquet are columnar binary formats that analytics
+# tools (pandas, polars, DuckDB, Spark) load directly. Parquet compresses its
+# columns itself (zstd), and rows are grouped into row groups of up to
+# `parquet_row_group_size` rows. Both need `pyarrow`, which is optional.
+
+import asyncio
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Media type of each format
+EXPORT_FORMATS: Dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNAR_FORMATS = ("arrow", "parquet")
+
+# Column order, as in the `Item` model
+EXPORT_FIELDS = ("name", "quantity", "id")
+
+
+def format_available(fmt: str) -> bool:
+    return fmt not in COLUMNAR_FORMATS or pyarrow is not None
+
+
+def arrow_schema():
+    return pyarrow.schema([("name", pyarrow.string()), ("quantity", pyarrow.int64()), ("id", pyarrow.int64())])
+
+
+class ChunkSink:
+    """
+    Write-only file for the pyarrow writers: keeps what they write until `drain()`
+    hands it over to be sent.
+    """
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def encode_csv(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in batches:
+        writer.writerows([row[field] for field in EXPORT_FIELDS] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Only the header, the table is empty
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        if orjson is not None:
+            yield b"".join(orjson.dumps({field: row[field] for field in EXPORT_FIELDS}) + b"\n" for row in rows)
+        else:
+            yield "".join(json.dumps({field: row[field] for field in EXPORT_FIELDS}) + "\n" for row in rows).encode()
+
+
+async def encode_arrow(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    schema = arrow_schema()
+    sink = ChunkSink()
+    with pyarrow.ipc.new_stream(pyarrow.PythonFile(sink, mode="w"), schema) as writer:
+        async for rows in batches:
+            writer.write_batch(pyarrow.RecordBatch.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def encode_parquet(batches: AsyncIterator[List[dict]], row_group_size: int) -> AsyncIterator[bytes]:
+    schema = arrow_schema()
+    sink = ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode="w"), schema, compression="zstd")
+    pending: List[dict] = []
+    try:
+        async for rows in batches:
+            pending.extend(rows)
+            if len(pending) >= row_group_size:
+                table = pyarrow.Table.from_pylist(pending, schema=schema)
+                pending = []
+                # One row group per write. Encoding and compressing it takes a while, keep the event loop free
+                await asyncio.to_thread(writer.write_table, table)
+                yield sink.drain()
+        if pending:
+            await asyncio.to_thread(writer.write_table, pyarrow.Table.from_pylist(pending, schema=schema))
+    finally:
+        # Writes the footer, a Parquet file is only readable with it
+        writer.close()
+    yield sink.drain()
+
+
+def encode(batches: AsyncIterator[List[dict]], fmt: str, parquet_row_group_size: int = 65536) -> AsyncIterator[bytes]:
+    """
+    Encode item batches in `fmt` (one of `EXPORT_FORMATS`).
+    """
+    if fmt == "csv":
+        return encode_csv(batches)
+    if fmt == "ndjson":
+        return encode_ndjson(batches)
+    if fmt == "arrow":
+        return encode_arrow(batches)
+    if fmt == "parquet":
+        return encode_parquet(batches, parquet_row_group_size)
+    raise ValueError(f"Unknown export format {fmt!r}, expected one of {', '.join(EXPORT_FORMATS)}")
@@ -0,0 +1,119 @@
+# In-Memory Item Snapshot
+# A copy of the whole `items` table kept in RAM, so the inventory application can
+# answer `GET /items` and `GET /items/{item_id}` without touching the database:
+# - `items`: every item by ID, for single lookups.
+# - `ids`: all IDs in sorted order, so keyset pagination (`after_id`) is a bisect
+#   instead of a scan.
+# It is loaded once at startup and then kept current by the write handlers, which
+# `put()` or `delete()` every item they commit. Like `LRUCache` it is only used from
+# the event loop, so no locking.
+#
+# A reload (or a consistency check) reads the table while writes keep going.
+# Writes recorded in the meantime are tracked (`begin_tracking()`), then replayed
+# on top of the freshly read rows (or left out of the comparison), so they are
+# never lost or reported as differences.
+
+from bisect import bisect_right, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Columns compared by `diff()`
+COMPARED_FIELDS = ("name", "quantity", "version")
+
+
+class ItemSnapshot:
+    def __init__(self):
+        self.items: Dict[int, dict] = {}
+        self.ids: List[int] = []
+        self.loads = 0
+        self._trackers: List[Dict[int, Optional[dict]]] = []
+
+    def begin_tracking(self) -> Dict[int, Optional[dict]]:
+        """
+        Start recording every `put`/`delete` (item ID -> new item, or None if deleted)
+        into the returned dict, until `end_tracking()` is called with it.
+        """
+        tracker: Dict[int, Optional[dict]] = {}
+        self._trackers.append(tracker)
+        return tracker
+
+    def end_tracking(self, tracker: Dict[int, Optional[dict]]):
+        self._trackers.remove(tracker)
+
+    def load(self, rows: Iterable[dict], changes: Optional[Dict[int, Optional[dict]]] = None):
+        """
+        Replace the contents with `rows`, then re-apply `changes` (writes recorded
+        while `rows` were being read, see `begin_tracking`).
+        """
+        self.items = {row["id"]: row for row in rows}
+        for item_id, item in (changes or {}).items():
+            if item is None:
+                self.items.pop(item_id, None)
+            else:
+                self.items[item_id] = item
+        self.ids = sorted(self.items)
+        self.loads += 1
+
+    def get(self, item_id: int) -> Optional[dict]:
+        return self.items.get(item_id)
+
+    def put(self, item: dict):
+        item_id = item["id"]
+        if item_id not in self.items:
+            # New IDs are almost always the largest, so this is usually an append
+            insort(self.ids, item_id)
+        self.items[item_id] = item
+        for tracker in self._trackers:
+            tracker[item_id] = item
+
+    def delete(self, item_id: int):
+        if self.items.pop(item_id, None) is not None:
+            del self.ids[bisect_right(self.ids, item_id) - 1]
+        for tracker in self._trackers:
+            tracker[item_id] = None
+
+    def select(self, after_id: Optional[int] = None, limit: Optional[int] = None,
+               predicate: Optional[Callable[[dict], bool]] = None) -> List[dict]:
+        """
+        Items in ID order, starting after `after_id`, keeping only those matching
+        `predicate`, at most `limit` of them.
+        """
+        start = bisect_right(self.ids, after_id) if after_id is not None else 0
+        selected = []
+        for index in range(start, len(self.ids)):
+            item = self.items[self.ids[index]]
+            if predicate is None or predicate(item):
+                selected.append(item)
+                if limit is not None and len(selected) == limit:
+                    break
+        return selected
+
+    def diff(self, rows: Iterable[dict], ignore: Iterable[int] = ()) -> Dict[str, Any]:
+        """
+        Compare the snapshot with `rows` read from the database. IDs in `ignore`
+        (written during the comparison) are skipped.
+        - missing: IDs in the database but not in the snapshot.
+        - extra: IDs in the snapshot but not in the database.
+        - different: IDs whose name, quantity or version differ.
+        """
+        ignore = set(ignore)
+        database_items = {row["id"]: row for row in rows if row["id"] not in ignore}
+        snapshot_ids = set(self.items) - ignore
+        different = [
+            item_id for item_id in sorted(snapshot_ids & database_items.keys())
+            if any(self.items[item_id][field] != database_items[item_id][field] for field in COMPARED_FIELDS)
+        ]
+        missing = sorted(database_items.keys() - snapshot_ids)
+        extra = sorted(snapshot_ids - database_items.keys())
+        return {
+            "consistent": not (missing or extra or different),
+            "checked": len(database_items),
+            "missing": missing,
+            "extra": extra,
+            "different": different,
+        }
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"items": len(self.items), "loads": self.loads}
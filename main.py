@@ -18,6 +18,12 @@ from pydantic import BaseModel, Field
 # Optional: Used for type hinting optional parameters.
 from typing import Optional
 
+# install_metrics: Records per-route request counts and latencies and serves them at /metrics.
+from metrics import install_metrics
+
+# install_compression: Compresses large responses with gzip, brotli or zstd (whatever the client accepts).
+from response_compression import install_compression
+
 # Configuration for API Tags
 # Tags help organize endpoints in the Swagger documentation.
 tags_metadata = [
@@ -50,6 +56,14 @@ app = FastAPI(
     openapi_tags=tags_metadata
 )
 
+# Compression
+# Responses of 1 KiB or more are compressed for clients that send Accept-Encoding.
+install_compression(app)
+
+# Metrics
+# Must be installed before the routes below are declared, so they are all measured.
+metrics = install_metrics(app, tags=["General"])
+
 
 # --- GENERAL ENDPOINTS ---
 
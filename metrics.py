@@ -0,0 +1,195 @@
+# Request and Database Metrics
+# A tiny, dependency-free metrics layer shared by `main.py` and
+# `inventory-application.py`:
+# 1. `MetricsMiddleware` counts requests and records a latency histogram per
+#    route template (e.g. `/items/{item_id}`, not `/items/42`), and `MetricsRoute`
+#    tracks how many requests are in flight per route template.
+# 2. `instrument_database()` times every query made through a `databases.Database`.
+# 3. `install_metrics()` wires both into an app and exposes them at `GET /metrics`
+#    in the Prometheus text format.
+# Recording is a couple of dictionary updates per request, so it stays cheap on the hot path.
+
+import bisect
+import functools
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+
+# Histogram bucket upper bounds in seconds (Prometheus' defaults)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class Histogram:
+    """
+    Latency histogram keyed by a tuple of label values.
+    Each series keeps a count per bucket plus the total count and sum.
+    """
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, seconds: float):
+        series = self.series.get(labels)
+        if series is None:
+            # [bucket counts..., +Inf count, sum]
+            series = self.series[labels] = [0] * (len(BUCKETS) + 1) + [0.0]
+        series[bisect.bisect_left(BUCKETS, seconds)] += 1
+        series[-1] += seconds
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in self.series.items():
+            label_text = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-1]}")
+        return lines
+
+
+def format_labels(names: Iterable[str], values: Iterable) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+class Metrics:
+    """
+    All metrics of one application.
+    `collectors` are extra callables returning Prometheus text lines, so an app
+    can export its own gauges (pool sizes, cache hits, ...) on the same endpoint.
+    """
+    def __init__(self):
+        self.requests: Dict[tuple, int] = defaultdict(int)
+        self.in_flight: Dict[tuple, int] = defaultdict(int)
+        self.request_latency = Histogram(
+            "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+        )
+        self.query_latency = Histogram(
+            "db_query_duration_seconds", "Database call latency by database and operation.", ("database", "operation")
+        )
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def render(self) -> str:
+        lines = ["# HELP http_requests_total Total HTTP requests by route template and status.",
+                 "# TYPE http_requests_total counter"]
+        for labels, count in self.requests.items():
+            lines.append(f"http_requests_total{{{format_labels(('method', 'route', 'status'), labels)}}} {count}")
+        lines += ["# HELP http_requests_in_flight HTTP requests currently being handled.",
+                  "# TYPE http_requests_in_flight gauge"]
+        for labels, count in self.in_flight.items():
+            lines.append(f"http_requests_in_flight{{{format_labels(('method', 'route'), labels)}}} {count}")
+        lines += self.request_latency.render()
+        lines += self.query_latency.render()
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (cheaper than `BaseHTTPMiddleware`).
+    The router stores the matched route in the scope, so once the request has
+    been handled we can label it with the route template.
+    """
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metrics = self.metrics
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            # Unmatched paths share one label so random URLs cannot blow up cardinality
+            template = getattr(route, "path", "unmatched")
+            metrics.requests[(method, template, status)] += 1
+            metrics.request_latency.observe((method, template), elapsed)
+
+
+class MetricsRoute(APIRoute):
+    """
+    Route class that keeps the in-flight gauge, which needs the route template
+    before the handler runs. Set by `install_metrics()` as the app's `route_class`.
+    """
+    async def handle(self, scope, receive, send):
+        in_flight = scope["app"].state.metrics.in_flight
+        key = (scope["method"], self.path)
+        in_flight[key] += 1
+        try:
+            await super().handle(scope, receive, send)
+        finally:
+            in_flight[key] -= 1
+
+
+def instrument_database(database, name: str, metrics: Metrics):
+    """
+    Wrap the query methods of a `databases.Database` so each call is timed.
+    For `iterate` the time covers the whole iteration.
+    """
+    histogram = metrics.query_latency
+
+    def timed(method, operation):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                histogram.observe((name, operation), time.perf_counter() - start)
+        return wrapper
+
+    def timed_iterate(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                async for row in method(*args, **kwargs):
+                    yield row
+            finally:
+                histogram.observe((name, "iterate"), time.perf_counter() - start)
+        return wrapper
+
+    for operation in ("fetch_all", "fetch_one", "fetch_val", "execute", "execute_many"):
+        setattr(database, operation, timed(getattr(database, operation), operation))
+    database.iterate = timed_iterate(database.iterate)
+
+
+def install_metrics(app: FastAPI, tags: List[str] = None) -> Metrics:
+    """
+    Add `MetricsMiddleware` to `app` and expose the metrics at `GET /metrics`.
+    Call it right after creating the app: only routes declared afterwards get `MetricsRoute`.
+    """
+    metrics = app.state.metrics = Metrics()
+    app.router.route_class = MetricsRoute
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    @app.get("/metrics", tags=tags, summary="Prometheus metrics", response_class=PlainTextResponse)
+    def read_metrics():
+        """
+        Request counts, in-flight requests and latency histograms in the Prometheus text format.
+        """
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    return metrics
@@ -0,0 +1,351 @@
+# Schema Migrations for the Inventory Application
+# The database schema is built up by the numbered steps in `MIGRATIONS`. The
+# versions already applied are recorded in the `schema_migrations` table, so a
+# new column or index is added by appending a step, without recreating `db.db`.
+#
+# The app runs `migrate()` once at startup (in its lifespan), and it can also be
+# run by hand before deploying:
+#   python migrations.py [DATABASE_URL]   (defaults to $INVENTORY_DATABASE_URL, then db.db)
+#
+# When several worker processes start at once, the first one takes the database's
+# write lock (`BEGIN IMMEDIATE` on SQLite, an advisory lock on PostgreSQL) and
+# applies the pending steps while the others wait for it, then find nothing left to do.
+#
+# Steps that need dialect-specific SQL check `connection.dialect.name`. On PostgreSQL
+# migrations run through SQLAlchemy's default synchronous driver (psycopg2), since
+# asyncpg is async-only.
+
+import os
+import sys
+from typing import Callable, List, Tuple
+
+import sqlalchemy
+
+DEFAULT_DATABASE_URL = "sqlite:///./db.db"
+
+# Any constant works, it only has to be the same in every process migrating the database
+POSTGRES_MIGRATION_LOCK = 742_001
+
+
+def create_items_table(connection):
+    # An INTEGER PRIMARY KEY is SQLite's auto-incrementing rowid, PostgreSQL needs SERIAL
+    id_type = "SERIAL" if connection.dialect.name == "postgresql" else "INTEGER"
+    connection.exec_driver_sql(f"""
+        CREATE TABLE IF NOT EXISTS items (
+            id {id_type} NOT NULL,
+            name VARCHAR,
+            quantity INTEGER,
+            PRIMARY KEY (id)
+        )
+    """)
+
+
+def add_items_version(connection):
+    # Bumped by every write, used to build the item's ETag
+    columns = {column["name"] for column in sqlalchemy.inspect(connection).get_columns("items")}
+    if "version" not in columns:
+        connection.exec_driver_sql("ALTER TABLE items ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+
+def add_items_indexes(connection):
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_items_name ON items (name)")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_items_quantity ON items (quantity)")
+
+
+def add_items_fts(connection):
+    """
+    `items_fts` is an FTS5 index over `items.name` using the trigram tokenizer, so any
+    part of a word (3+ characters, case-insensitive) can be found without a
+    `LIKE '%x%'` scan. It is an external-content table: it stores only the index and
+    reads names from `items`. Triggers keep it in sync with every insert, update and
+    delete, whatever code path makes them. Existing items are indexed right away.
+    PostgreSQL gets the equivalent from `pg_trgm`: a trigram GIN index on `items.name`
+    that answers `ILIKE '%x%'`, maintained by PostgreSQL itself.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_items_name_trgm ON items USING gin (name gin_trgm_ops)"
+        )
+        return
+    if sqlalchemy.inspect(connection).has_table("items_fts"):
+        return
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE items_fts USING fts5(name, content='items', content_rowid='id', tokenize='trigram')"
+    )
+    create_items_fts_triggers(connection)
+    connection.exec_driver_sql("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+
+
+def create_items_fts_triggers(connection):
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF name ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+
+
+def add_item_change_log(connection):
+    """
+    `item_change_log` is an append-only log of every insert, update and delete on
+    `items`, for `GET /items/changes`. `seq` only ever grows (AUTOINCREMENT never
+    reuses a number, even after old entries are compacted away). Each entry holds
+    the item's new values, or NULLs for a delete (a tombstone). Like `items_fts`
+    it is written by triggers, so every change is logged in the transaction that
+    makes it, whatever code path that is. Existing items are logged as `created`.
+    `item_change_log_state.purged_through` is the highest sequence of a purged
+    tombstone: clients that last synced before it must start over.
+    On PostgreSQL concurrent transactions commit their sequence numbers out of
+    order, so a client reading in `seq` order could skip one that commits late.
+    There each entry also records its transaction ID (`xid`), and `GET /items/changes`
+    reads entries in `(xid, seq)` order, only from transactions older than every
+    running one; `purged_through_xid` is the highest `xid` of a purged tombstone.
+    Writers never wait for each other.
+    """
+    if connection.dialect.name == "postgresql":
+        seq_type = "BIGSERIAL PRIMARY KEY"
+        now = "(now() AT TIME ZONE 'utc')"
+        xid_column = "xid xid8 NOT NULL DEFAULT pg_current_xact_id(),"
+        purged_xid_column = ", purged_through_xid xid8"
+    else:
+        seq_type = "INTEGER PRIMARY KEY AUTOINCREMENT"
+        now = "CURRENT_TIMESTAMP"
+        xid_column = purged_xid_column = ""
+    connection.exec_driver_sql(f"""
+        CREATE TABLE IF NOT EXISTS item_change_log (
+            seq {seq_type},
+            {xid_column}
+            item_id INTEGER NOT NULL,
+            type VARCHAR NOT NULL,
+            name VARCHAR,
+            quantity INTEGER,
+            version INTEGER,
+            changed_at TIMESTAMP NOT NULL DEFAULT {now}
+        )
+    """)
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_item_change_log_item_id ON item_change_log (item_id, seq)")
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_item_change_log_xid ON item_change_log (xid, seq)")
+    connection.exec_driver_sql(f"""
+        CREATE TABLE IF NOT EXISTS item_change_log_state (
+            id INTEGER PRIMARY KEY,
+            purged_through BIGINT NOT NULL{purged_xid_column}
+        )
+    """)
+    connection.exec_driver_sql("INSERT INTO item_change_log_state (id, purged_through) VALUES (1, 0)")
+    connection.exec_driver_sql("""
+        INSERT INTO item_change_log (item_id, type, name, quantity, version)
+        SELECT id, 'created', name, quantity, version FROM items ORDER BY id
+    """)
+
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("""
+            CREATE OR REPLACE FUNCTION log_item_change() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO item_change_log (item_id, type) VALUES (OLD.id, 'deleted');
+                    RETURN OLD;
+                END IF;
+                INSERT INTO item_change_log (item_id, type, name, quantity, version)
+                VALUES (NEW.id, CASE TG_OP WHEN 'INSERT' THEN 'created' ELSE 'updated' END,
+                        NEW.name, NEW.quantity, NEW.version);
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        connection.exec_driver_sql("""
+            CREATE TRIGGER items_change_log AFTER INSERT OR UPDATE OR DELETE ON items
+            FOR EACH ROW EXECUTE FUNCTION log_item_change()
+        """)
+        return
+    create_change_log_triggers(connection)
+
+
+def create_change_log_triggers(connection):
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS items_change_log_insert AFTER INSERT ON items BEGIN
+            INSERT INTO item_change_log (item_id, type, name, quantity, version)
+            VALUES (new.id, 'created', new.name, new.quantity, new.version);
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS items_change_log_update AFTER UPDATE ON items BEGIN
+            INSERT INTO item_change_log (item_id, type, name, quantity, version)
+            VALUES (new.id, 'updated', new.name, new.quantity, new.version);
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS items_change_log_delete AFTER DELETE ON items BEGIN
+            INSERT INTO item_change_log (item_id, type) VALUES (old.id, 'deleted');
+        END
+    """)
+
+
+def make_item_ids_unique(connection):
+    """
+    A plain `INTEGER PRIMARY KEY` hands the highest ID back out once that item is
+    deleted, and with `version` starting at 1 again the new item would get the old
+    one's ETag (`"<id>-<version>"`). With AUTOINCREMENT SQLite never reuses an ID.
+    Adding it means rebuilding `items` (same rows and IDs), its indexes and triggers.
+    The counter starts past every ID the change log has seen, deleted ones included.
+    PostgreSQL's SERIAL never reuses IDs already.
+    """
+    if connection.dialect.name == "postgresql":
+        return
+    connection.exec_driver_sql("""
+        CREATE TABLE items_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR,
+            quantity INTEGER,
+            version INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    connection.exec_driver_sql("INSERT INTO items_new (id, name, quantity, version) SELECT id, name, quantity, version FROM items")
+    # Replaces the counter row the copy above created
+    connection.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'items_new'")
+    connection.exec_driver_sql("""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'items_new', MAX(COALESCE((SELECT MAX(id) FROM items), 0), COALESCE((SELECT MAX(item_id) FROM item_change_log), 0))
+    """)
+    # Also drops the table's indexes and triggers, without firing any
+    connection.exec_driver_sql("DROP TABLE items")
+    connection.exec_driver_sql("ALTER TABLE items_new RENAME TO items")
+    add_items_indexes(connection)
+    create_items_fts_triggers(connection)
+    create_change_log_triggers(connection)
+
+
+def add_items_name_c_index(connection):
+    """
+    The `name_prefix` filter is a range (`name >= 'ab' AND name < 'ac'`), which only
+    matches the prefix in code point order. PostgreSQL sorts text by the database's
+    locale, so there the range is compared with `COLLATE "C"`, and needs an index
+    in that collation. SQLite already compares code points.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_items_name_c ON items (name COLLATE "C")')
+
+
+def add_change_log_epoch(connection):
+    """
+    `item_change_log_state.epoch` counts the compactions that purged tombstones.
+    `GET /items/changes` hands it out next to `next_since`, so a cursor issued after
+    a purge (e.g. while replaying from `since=0`) is not mistaken for one that
+    predates it: only cursors from an earlier epoch below `purged_through` are stale.
+    """
+    connection.exec_driver_sql("ALTER TABLE item_change_log_state ADD COLUMN epoch BIGINT NOT NULL DEFAULT 0")
+
+
+# (version, description, step). Never edit or reorder a released step, append a new one.
+# The first steps are written to also accept databases created before migrations
+# existed (when the app ran `create_all` at import).
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "Create items table", create_items_table),
+    (2, "Add items.version for ETags", add_items_version),
+    (3, "Index items.name and items.quantity", add_items_indexes),
+    (4, "Add items_fts full-text index", add_items_fts),
+    (5, "Add item_change_log for incremental sync", add_item_change_log),
+    (6, "Never reuse item IDs", make_item_ids_unique),
+    (7, "Index items.name in code point order on PostgreSQL", add_items_name_c_index),
+    (8, "Add item_change_log_state.epoch for sync cursors", add_change_log_epoch),
+]
+
+
+def create_migration_engine(database_url: str) -> sqlalchemy.Engine:
+    """
+    Synchronous engine used only while migrating. For SQLite, transactions start
+    with `BEGIN IMMEDIATE`, so concurrent migrators queue on the write lock instead
+    of racing each other. Connections with the `read_only` execution option use a
+    plain `BEGIN`, which takes no lock until something is written.
+    For PostgreSQL the same queueing is done by `lock_migrations()`.
+    """
+    url = sqlalchemy.engine.make_url(database_url)
+    if url.get_backend_name() in ("postgres", "postgresql"):
+        # Drop any async driver (`postgresql+asyncpg://`) for SQLAlchemy's default one
+        return sqlalchemy.create_engine(url.set(drivername="postgresql"))
+    engine = sqlalchemy.create_engine(
+        database_url, connect_args={"isolation_level": None, "timeout": 30}
+    )
+
+    @sqlalchemy.event.listens_for(engine, "begin")
+    def begin_immediate(connection):
+        read_only = connection.get_execution_options().get("read_only", False)
+        connection.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+    return engine
+
+
+def lock_migrations(connection):
+    """
+    On PostgreSQL, hold a transaction-level advisory lock until the migrating
+    transaction ends. SQLite is already locked by `BEGIN IMMEDIATE`.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(sqlalchemy.text("SELECT pg_advisory_xact_lock(:key)"), {"key": POSTGRES_MIGRATION_LOCK})
+
+
+def applied_versions(connection) -> set:
+    if not sqlalchemy.inspect(connection).has_table("schema_migrations"):
+        return set()
+    return {row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_migrations")}
+
+
+def migrate(database_url: str = DEFAULT_DATABASE_URL) -> List[str]:
+    """
+    Apply every pending migration and return the descriptions of those applied.
+    """
+    latest = MIGRATIONS[-1][0]
+    engine = create_migration_engine(database_url)
+    applied = []
+    try:
+        # Cheap check first, so an up-to-date database never takes the write lock
+        with engine.connect().execution_options(read_only=True) as connection:
+            if latest in applied_versions(connection):
+                return applied
+
+        with engine.begin() as connection:
+            lock_migrations(connection)
+            connection.exec_driver_sql("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR NOT NULL,
+                    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Another process may have migrated while we waited for the lock
+            done = applied_versions(connection)
+            for version, description, step in MIGRATIONS:
+                if version in done:
+                    continue
+                step(connection)
+                connection.execute(
+                    sqlalchemy.text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                    {"version": version, "description": description},
+                )
+                applied.append(f"{version}: {description}")
+    finally:
+        # The app only talks to the database through `databases`, so don't keep this engine around
+        engine.dispose()
+    return applied
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else os.getenv("INVENTORY_DATABASE_URL", DEFAULT_DATABASE_URL)
+    applied = migrate(url)
+    if applied:
+        print("Applied migrations:")
+        for line in applied:
+            print(f"  {line}")
+    else:
+        print("Database is up to date.")
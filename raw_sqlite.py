@@ -0,0 +1,166 @@
+# Raw aiosqlite Data Access
+# An alternative to `databases` for SQLite: `RawSQLiteDatabase` has the same methods
+# the inventory app uses (`fetch_all`, `fetch_one`, `fetch_val`, `execute`,
+# `iterate`, `transaction`, `connect`, `disconnect`) but talks to aiosqlite directly:
+# - Rows come back as plain dicts straight from the cursor, with no Record/Row
+#   wrapping or result processing.
+# - Precompiled `Statement`s (see `statements.py`) run with their cached SQL, plain
+#   strings go to SQLite as they are (`:name` parameters are native), and only other
+#   SQLAlchemy expressions are compiled per call.
+# It reuses `SQLiteConnectionPool`, so pool sizes, read-only connections and pool
+# stats work as with `PooledDatabase`. Like `databases`, each asyncio task keeps
+# the same connection while it is inside a transaction; nested transactions are
+# SAVEPOINTs.
+
+import contextvars
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiosqlite
+from databases.core import DatabaseURL
+from sqlalchemy.dialects.sqlite import pysqlite
+from sqlalchemy.sql import ClauseElement
+
+from sqlite_pool import SQLiteConnectionPool
+from statements import BoundStatement, bind_arguments, parameters_of
+
+
+class RawSQLiteDatabase:
+    """
+    `databases.Database` look-alike for SQLite returning plain dicts.
+    Accepts the same `pool_size`, `pool_name` and `read_only` options as `PooledDatabase`,
+    other options are passed to `sqlite3.connect`.
+    """
+    _ids = itertools.count()
+
+    def __init__(self, url: str, *, pool_size: int = 1, pool_name: str = "default", read_only: bool = False, **options: Any):
+        self.url = DatabaseURL(url)
+        self._pool = SQLiteConnectionPool(self.url, size=pool_size, name=pool_name, read_only=read_only, **options)
+        self._dialect = pysqlite.dialect(paramstyle="qmark")
+        # (connection, transaction depth) held by the current task, if any
+        self._current = contextvars.ContextVar(f"raw_sqlite_{next(self._ids)}", default=None)
+
+    async def connect(self) -> None:
+        # Connections are opened on first use by the pool
+        pass
+
+    async def disconnect(self) -> None:
+        await self._pool.close()
+
+    def _compile(self, query, values: Optional[Dict[str, Any]]) -> Tuple[str, Any]:
+        if isinstance(query, str):
+            return query, values or ()
+        if isinstance(query, BoundStatement):
+            cached = query.statement.compiled.get(RawSQLiteDatabase)
+            if cached is None:
+                compiled = query.statement.clause.compile(dialect=self._dialect, compile_kwargs={"render_postcompile": True})
+                cached = query.statement.compiled[RawSQLiteDatabase] = (compiled.string, *parameters_of(compiled))
+            sql, *parameters = cached
+            return sql, bind_arguments(*parameters, query.values)
+        if isinstance(query, ClauseElement):
+            compiled = query.compile(dialect=self._dialect, compile_kwargs={"render_postcompile": True})
+            names, processors, _ = parameters_of(compiled)
+            return compiled.string, bind_arguments(names, processors, {}, compiled.construct_params())
+        raise TypeError(f"Unsupported query type {type(query).__name__}")
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        The current task's connection if it is in a transaction, else one from the pool.
+        """
+        current = self._current.get()
+        if current is not None:
+            yield current[0]
+            return
+        connection = await self._pool.acquire()
+        try:
+            yield connection
+        finally:
+            await self._pool.release(connection)
+
+    async def fetch_all(self, query, values: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        sql, args = self._compile(query, values)
+        async with self._connection() as connection:
+            async with connection.execute(sql, args) as cursor:
+                rows = await cursor.fetchall()
+                names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    async def fetch_one(self, query, values: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        sql, args = self._compile(query, values)
+        async with self._connection() as connection:
+            async with connection.execute(sql, args) as cursor:
+                row = await cursor.fetchone()
+                if row is None:
+                    return None
+                return dict(zip((column[0] for column in cursor.description), row))
+
+    async def fetch_val(self, query, values: Optional[Dict[str, Any]] = None, column: int = 0) -> Any:
+        sql, args = self._compile(query, values)
+        async with self._connection() as connection:
+            async with connection.execute(sql, args) as cursor:
+                row = await cursor.fetchone()
+        return None if row is None else row[column]
+
+    async def execute(self, query, values: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Like `databases`: the new rowid for an INSERT, otherwise the number of rows changed.
+        """
+        sql, args = self._compile(query, values)
+        async with self._connection() as connection:
+            async with connection.execute(sql, args) as cursor:
+                return cursor.lastrowid or cursor.rowcount
+
+    async def execute_many(self, query, values: List[Dict[str, Any]]) -> None:
+        async with self._connection() as connection:
+            for row_values in values:
+                sql, args = self._compile(query, row_values)
+                await connection.execute(sql, args)
+
+    async def iterate(self, query, values: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        sql, args = self._compile(query, values)
+        async with self._connection() as connection:
+            async with connection.execute(sql, args) as cursor:
+                names = [column[0] for column in cursor.description]
+                async for row in cursor:
+                    yield dict(zip(names, row))
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """
+        `BEGIN` ... `COMMIT` (or `ROLLBACK` on error). Inside another transaction of
+        the same task it is a `SAVEPOINT` instead, so only its own work is undone.
+        """
+        current = self._current.get()
+        if current is not None:
+            connection, depth = current
+            savepoint = f"raw_sqlite_{depth}"
+            token = self._current.set((connection, depth + 1))
+            await connection.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield
+            except BaseException:
+                await connection.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                await connection.execute(f"RELEASE SAVEPOINT {savepoint}")
+                raise
+            else:
+                await connection.execute(f"RELEASE SAVEPOINT {savepoint}")
+            finally:
+                self._current.reset(token)
+            return
+
+        connection = await self._pool.acquire()
+        token = self._current.set((connection, 1))
+        try:
+            await connection.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                await connection.rollback()
+                raise
+            else:
+                await connection.commit()
+        finally:
+            self._current.reset(token)
+            await self._pool.release(connection)
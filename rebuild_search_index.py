@@ -0,0 +1,41 @@
+import os
+import sqlite3
+import sys
+
+import sqlalchemy
+
+from migrations import DEFAULT_DATABASE_URL
+
+# Rebuilds the full-text search index (`items_fts`) of the inventory application
+# from the `items` table. Useful after restoring `db.db` from a backup or if the
+# index was ever suspected to be out of sync. The application itself creates and
+# fills the index the first time it starts on a database.
+#
+# SQLite only: PostgreSQL maintains its trigram index itself.
+# Usage: python rebuild_search_index.py [DATABASE_URL]   (defaults to $INVENTORY_DATABASE_URL, then db.db)
+
+url = sqlalchemy.engine.make_url(
+    sys.argv[1] if len(sys.argv) > 1 else os.getenv("INVENTORY_DATABASE_URL", DEFAULT_DATABASE_URL)
+)
+if url.get_backend_name() != "sqlite":
+    sys.exit(f"Only SQLite databases have a search index to rebuild, not {url.get_backend_name()}.")
+
+conn = None
+try:
+    conn = sqlite3.connect(url.database)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='items_fts';")
+    if cursor.fetchone() is None:
+        print("No search index found. Start the inventory application once to create it.")
+    else:
+        cursor.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild');")
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM items;")
+        print(f"Search index rebuilt for {cursor.fetchone()[0]} items.")
+
+except sqlite3.Error as e:
+    print(f"An error occurred: {e}")
+finally:
+    if conn:
+        conn.close()
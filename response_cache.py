@@ -0,0 +1,44 @@
+# Pre-Serialized Response Cache
+# Holds fully encoded (and optionally compressed, see `response_compression.py`)
+# response bodies, so a repeated request is answered with the bytes built the
+# first time instead of a database read plus a JSON encode.
+# Every entry belongs to one version of the data (the inventory app uses the list
+# ETag). The first lookup with a newer version drops all entries, so a write
+# invalidates everything cached before it without the write handlers having to
+# know about this cache.
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from cache import LRUCache
+
+
+class ResponseCache:
+    """
+    LRU cache of `(body, headers)` pairs for one data version at a time.
+    - max_size: Maximum number of cached responses (0 disables the cache).
+    """
+    def __init__(self, max_size: int):
+        self.version: Optional[Hashable] = None
+        self.invalidations = 0
+        self._cache = LRUCache(max_size)
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.max_size > 0
+
+    def get(self, version: Hashable, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        if version != self.version:
+            self.version = version
+            if len(self._cache):
+                self._cache.clear()
+                self.invalidations += 1
+        return self._cache.get(key)
+
+    def set(self, version: Hashable, key: Hashable, body: bytes, headers: Dict[str, str]):
+        # A response built from an older version of the data is useless
+        if version == self.version:
+            self._cache.set(key, (body, headers))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        return {**stats, "invalidations": self.invalidations}
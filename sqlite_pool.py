@@ -0,0 +1,170 @@
+# SQLite Connection Pool for `databases`
+# The stock `databases` SQLite backend opens a brand new aiosqlite connection
+# (and a new thread) for every query and closes it right after. This module
+# keeps a fixed number of connections open and hands them out instead, so that:
+# 1. Reads can use a pool of read-only (`mode=ro`) connections that run in
+#    parallel under WAL.
+# 2. Writes go through a single dedicated writer connection.
+# 3. We can measure how long requests wait for a connection.
+# It also has `retry_on_busy()`, for writes that lose the lock to another process.
+# Connections of `PooledDatabase` also run precompiled statements (see `statements.py`),
+# on SQLite and on PostgreSQL.
+
+import asyncio
+import random
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiosqlite
+import databases
+from databases.backends.sqlite import SQLiteBackend, SQLiteConnection, SQLitePool
+from databases.core import DatabaseURL
+
+from statements import StatementCacheMixin
+
+
+class PoolStats:
+    """
+    Counters for one connection pool.
+    - acquisitions: Total number of connections handed out.
+    - waits: How many of those had to wait because every connection was busy.
+    - wait_seconds_total / wait_seconds_max: Time spent waiting for a connection.
+    """
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self.in_use = 0
+        self.acquisitions = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, waited: bool):
+        self.acquisitions += 1
+        self.wait_seconds_total += seconds
+        if waited:
+            self.waits += 1
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "acquisitions": self.acquisitions,
+            "waits": self.waits,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+# Stats of every pool created in this process, by pool name.
+pool_stats: Dict[str, PoolStats] = {}
+
+
+class SQLiteConnectionPool(SQLitePool):
+    """
+    Keeps up to `size` aiosqlite connections open and reuses them.
+    With `read_only=True` the file is opened as `file:<path>?mode=ro`.
+    """
+    def __init__(self, url: DatabaseURL, *, size: int, name: str, read_only: bool = False, **options: Any):
+        super().__init__(url, **options)
+        if read_only:
+            self._database = f"file:{url.database}?mode=ro"
+            self._options = {**self._options, "uri": True}
+        self._idle: List[aiosqlite.Connection] = []
+        self._semaphore = asyncio.Semaphore(size)
+        self.stats = pool_stats[name] = PoolStats(name, size)
+
+    async def acquire(self) -> aiosqlite.Connection:
+        waited = self._semaphore.locked()
+        start = time.perf_counter()
+        await self._semaphore.acquire()
+        self.stats.record_wait(time.perf_counter() - start, waited)
+        self.stats.in_use += 1
+        if self._idle:
+            return self._idle.pop()
+        try:
+            return await super().acquire()
+        except BaseException:
+            self.stats.in_use -= 1
+            self._semaphore.release()
+            raise
+
+    async def release(self, connection: aiosqlite.Connection) -> None:
+        self._idle.append(connection)
+        self.stats.in_use -= 1
+        self._semaphore.release()
+
+    async def close(self) -> None:
+        while self._idle:
+            await super().release(self._idle.pop())
+
+
+class PooledSQLiteConnection(StatementCacheMixin, SQLiteConnection):
+    pass
+
+
+class PooledSQLiteBackend(SQLiteBackend):
+    """
+    `databases` SQLite backend that uses `SQLiteConnectionPool`.
+    Accepts the extra options `pool_size`, `pool_name` and `read_only`.
+    """
+    def __init__(self, database_url, *, pool_size: int = 1, pool_name: str = "default", read_only: bool = False, **options: Any):
+        super().__init__(database_url, **options)
+        self._pool = SQLiteConnectionPool(
+            self._database_url, size=pool_size, name=pool_name, read_only=read_only, **options
+        )
+
+    def connection(self) -> PooledSQLiteConnection:
+        return PooledSQLiteConnection(self._pool, self._dialect)
+
+    async def disconnect(self) -> None:
+        await self._pool.close()
+        await super().disconnect()
+
+
+class PooledDatabase(databases.Database):
+    """
+    Drop-in replacement for `databases.Database` that pools SQLite connections.
+    PostgreSQL keeps asyncpg's pool; both can run precompiled statements.
+    Other dialects keep their usual backend.
+    """
+    SUPPORTED_BACKENDS = {
+        **databases.Database.SUPPORTED_BACKENDS,
+        "sqlite": "sqlite_pool:PooledSQLiteBackend",
+        "postgres": "statements:PostgresStatementBackend",
+        "postgresql": "statements:PostgresStatementBackend",
+    }
+
+
+SQLITE_BUSY = 5
+
+
+def is_busy_error(error: BaseException) -> bool:
+    """
+    True for SQLITE_BUSY ("database is locked") and its extended codes.
+    `sqlite_errorcode` only exists on Python 3.11+, older versions only have the message.
+    """
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    if hasattr(error, "sqlite_errorcode"):
+        return error.sqlite_errorcode & 0xFF == SQLITE_BUSY
+    return "database is locked" in str(error)
+
+
+async def retry_on_busy(operation: Callable[[], Awaitable[Any]], retries: int = 5, base_delay: float = 0.01) -> Any:
+    """
+    Run `operation()` and, if SQLite reports the database as busy, retry it with
+    exponential backoff and jitter (10 ms, 20 ms, 40 ms, ... by default).
+    `busy_timeout` already makes SQLite wait for most locks, but some conflicts
+    between processes fail immediately, so writers retry on top of it.
+    `operation` must be safe to run again: a transaction that failed was rolled back.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == retries or not is_busy_error(e):
+                raise
+            await asyncio.sleep(base_delay * 2 ** attempt * (0.5 + random.random()))
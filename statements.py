@@ -0,0 +1,102 @@
+# Precompiled SQL Statements
+# `databases` compiles every SQLAlchemy Core expression it is given to SQL again,
+# on every call, and the handlers build a new expression per request too. For the
+# queries the hot handlers run over and over, this module does both only once:
+# 1. A `Statement` is built once (at import time) with `param()` placeholders
+#    for the values that change per request.
+# 2. The first time it runs on a backend, it is compiled for that dialect and the
+#    SQL text, parameter order and bind processors are kept on the `Statement`.
+# 3. Each request only binds values: `database.fetch_one(GET_ITEM.bind(item_id=1))`.
+# The bound statement goes through `databases` like any query (transactions, the
+# group-commit writer and metrics all work as usual). Only the backend connections
+# need to recognise it; `StatementCacheMixin` adds that to them.
+# `bench_statements.py` measures the compile time saved.
+
+from typing import Any, Dict, List, Tuple
+
+import sqlalchemy
+from sqlalchemy.sql import ClauseElement
+
+try:
+    from databases.backends.postgres import PostgresBackend, PostgresConnection
+except ImportError:
+    # asyncpg is not installed, so PostgreSQL can't be used anyway
+    PostgresBackend = PostgresConnection = None
+
+
+def param(name: str) -> sqlalchemy.BindParameter:
+    """
+    A placeholder for a per-request value in a `Statement`. Not marked required,
+    so the statement can be compiled before any value is known.
+    """
+    return sqlalchemy.bindparam(name, required=False)
+
+
+class Statement:
+    """
+    A query built once, compiled once per backend. `bind()` gives the object
+    to pass to `fetch_one` / `fetch_val` / `execute`.
+    """
+    def __init__(self, clause: ClauseElement):
+        self.clause = clause
+        # Backend class -> what it needs to run the statement, e.g. (compiled result, *`parameters_of()`)
+        self.compiled: Dict[type, tuple] = {}
+
+    def bind(self, **values: Any) -> "BoundStatement":
+        return BoundStatement(self, values)
+
+
+def parameters_of(compiled) -> Tuple[List[str], Dict[str, Any], Dict[str, Any]]:
+    """
+    Argument names in placeholder order, bind processors and the values of the
+    literal parameters of a compiled statement.
+    """
+    # SQLite's `?` placeholders follow `positiontup`, `databases` numbers PostgreSQL's `$n` in sorted name order
+    names = list(compiled.positiontup) if compiled.positiontup is not None else sorted(compiled.params)
+    # Literals in the expression (e.g. the 1 in `version + 1`) are bind parameters with a value
+    defaults = {name: value for name, value in compiled.construct_params().items() if value is not None}
+    return names, dict(compiled._bind_processors), defaults
+
+
+def bind_arguments(names: List[str], processors: Dict[str, Any], defaults: Dict[str, Any], values: Dict[str, Any]) -> list:
+    values = {**defaults, **values} if defaults else values
+    return [processors[name](values[name]) if name in processors else values[name] for name in names]
+
+
+class BoundStatement:
+    __slots__ = ("statement", "values")
+
+    def __init__(self, statement: Statement, values: Dict[str, Any]):
+        self.statement = statement
+        self.values = values
+
+
+class StatementCacheMixin:
+    """
+    Mixin for `databases` backend connections: compiles a `BoundStatement` with the
+    backend's own `_compile()` the first time, then only re-binds its arguments.
+    """
+    def _compile(self, query):
+        if not isinstance(query, BoundStatement):
+            return super()._compile(query)
+        cached = query.statement.compiled.get(type(self))
+        if cached is None:
+            cached = query.statement.compiled[type(self)] = self._compile_statement(query.statement.clause)
+        result, *parameters = cached
+        return (result[0], bind_arguments(*parameters, query.values), *result[2:])
+
+    def _compile_statement(self, clause: ClauseElement):
+        compiled = clause.compile(dialect=self._dialect, compile_kwargs={"render_postcompile": True})
+        return (super()._compile(clause), *parameters_of(compiled))
+
+
+if PostgresBackend is not None:
+    class PostgresStatementConnection(StatementCacheMixin, PostgresConnection):
+        pass
+
+    class PostgresStatementBackend(PostgresBackend):
+        """
+        The stock `databases` PostgreSQL backend, with `StatementCacheMixin` on its connections.
+        """
+        def connection(self) -> PostgresStatementConnection:
+            return PostgresStatementConnection(self, self._dialect)
@@ -0,0 +1,165 @@
+# Backend Matrix for the Inventory Application
+# Runs the same CRUD, bulk, search, adjust and change log compaction checks
+# in-process against every storage backend available here:
+# - sqlite:   a throwaway `db.db` in a temporary directory (always).
+# - postgres: `$INVENTORY_TEST_POSTGRES_URL` (an empty database) if set, otherwise
+#             a temporary local cluster started with `initdb` / `pg_ctl` when
+#             they are on PATH.
+#             Needs `asyncpg` (the app) and `psycopg2` (migrations).
+# Backends that can't run are reported as skipped, not failed.
+#
+# Usage: python verify_backends.py [sqlite] [postgres]
+
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+from bench_json import load_app
+
+BACKENDS = ["sqlite", "postgres"]
+
+
+class Skipped(Exception):
+    pass
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def sqlite_url():
+    yield "sqlite:///./db.db"
+
+
+@contextmanager
+def postgres_url():
+    missing = [name for name in ("asyncpg", "psycopg2") if importlib.util.find_spec(name) is None]
+    if missing:
+        raise Skipped(f"{', '.join(missing)} not installed")
+    if os.getenv("INVENTORY_TEST_POSTGRES_URL"):
+        yield os.environ["INVENTORY_TEST_POSTGRES_URL"]
+        return
+    if not (shutil.which("initdb") and shutil.which("pg_ctl")):
+        raise Skipped("no INVENTORY_TEST_POSTGRES_URL and no initdb/pg_ctl on PATH")
+
+    data_dir = tempfile.mkdtemp(prefix="inventory-pg-")
+    port = free_port()
+    subprocess.run(["initdb", "-D", data_dir, "-U", "inventory", "--auth=trust"], check=True, stdout=subprocess.DEVNULL)
+    subprocess.run(
+        ["pg_ctl", "-D", data_dir, "-o", f"-p {port} -k {data_dir} -h 127.0.0.1", "-w", "start"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    try:
+        subprocess.run(["createdb", "-h", "127.0.0.1", "-p", str(port), "-U", "inventory", "inventory"], check=True)
+        yield f"postgresql://inventory@127.0.0.1:{port}/inventory"
+    finally:
+        subprocess.run(["pg_ctl", "-D", data_dir, "-m", "immediate", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def check(client):
+    created = client.post("/items", json={"name": "Blue Widget", "quantity": 5})
+    assert created.status_code == 200, created.text
+    item = created.json()
+    item_id = item["id"]
+
+    assert client.get(f"/items/{item_id}").json() == item
+    etag = client.get(f"/items/{item_id}").headers["ETag"]
+    assert client.get(f"/items/{item_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    updated = client.put(f"/items/{item_id}", json={"name": "Blue Widget", "quantity": 7}, headers={"If-Match": etag})
+    assert updated.json()["quantity"] == 7, updated.text
+    assert client.patch(f"/items/{item_id}", json={"quantity": 1}, headers={"If-Match": etag}).status_code == 412
+    assert client.patch(f"/items/{item_id}", json={"quantity": 8}).json()["quantity"] == 8
+
+    bulk = client.post("/items/bulk", json=[{"name": f"Gadget {i}", "quantity": i} for i in range(10)])
+    assert bulk.json()["count"] == 10, bulk.text
+    assert bulk.json()["ids"] == sorted(bulk.json()["ids"])
+    ndjson = "\n".join('{"name": "Sprocket %d", "quantity": 1}' % i for i in range(3))
+    assert client.post("/items/bulk/ndjson", content=ndjson).json()["count"] == 3
+
+    page = client.get("/items", params={"limit": 5})
+    assert len(page.json()) == 5 and "X-Next-After-Id" in page.headers
+    assert [i["name"] for i in client.get("/items", params={"name_prefix": "Gadget", "max_quantity": 2}).json()] == [
+        "Gadget 0", "Gadget 1", "Gadget 2"
+    ]
+    assert client.get("/items", params={"stream": "ndjson"}).text.count("\n") == 14
+    assert client.get("/items/export", params={"format": "ndjson"}).text == client.get("/items", params={"stream": "ndjson"}).text
+    assert [i["id"] for i in client.get("/items/search", params={"q": "idge"}).json()] == [item_id]
+
+    assert client.post(f"/items/{item_id}/adjust", json={"delta": -3}).json()["quantity"] == 5
+    assert client.post(f"/items/{item_id}/adjust", json={"delta": -6}).status_code == 409
+    assert client.post("/items/adjust", json=[{"id": item_id, "delta": 1}, {"id": 0, "delta": 1}]).status_code == 404
+    assert client.get(f"/items/{item_id}").json()["quantity"] == 5
+    full = client.post("/items", json={"name": "Full Bin", "quantity": 2**31 - 1}).json()
+    assert client.post(f"/items/{full['id']}/adjust", json={"delta": 1}).status_code == 409
+    assert client.get(f"/items/{full['id']}").json() == full
+    assert client.post("/items", json={"name": "Overflow", "quantity": 2**31}).status_code == 422
+    assert client.delete(f"/items/{full['id']}").status_code == 200
+
+    assert client.delete(f"/items/{item_id}").status_code == 200
+    assert client.get(f"/items/{item_id}").status_code == 404
+    assert client.delete(f"/items/{item_id}").status_code == 404
+
+    changes = client.get("/items/changes", params={"limit": 1000}).json()["changes"]
+    assert [c["seq"] for c in changes] == sorted(c["seq"] for c in changes)
+    assert [c["type"] for c in changes if c["id"] == item_id][0] == "created"
+    assert changes[-1] == {"seq": changes[-1]["seq"], "type": "deleted", "id": item_id, "item": None}
+
+
+def check_compaction(client, app_module):
+    """
+    After tombstones are purged, a replay from `since=0` in small pages completes,
+    and its cursor stays valid for later syncs; a cursor from before the purge is stale.
+    """
+    ids = client.post("/items/bulk", json=[{"name": f"Cog {i}", "quantity": i} for i in range(5)]).json()["ids"]
+    stale = client.get("/items/changes", params={"limit": 1000}).json()
+    client.delete(f"/items/{ids[0]}")
+    assert client.portal.call(app_module.compact_change_log, 0) is not None
+
+    since, epoch, seen = 0, 0, []
+    while True:
+        page = client.get("/items/changes", params={"since": since, "epoch": epoch, "limit": 2})
+        assert page.status_code == 200, page.text
+        body = page.json()
+        seen += [c["id"] for c in body["changes"]]
+        since, epoch = body["next_since"], body["epoch"]
+        if not body["has_more"]:
+            break
+    assert ids[0] not in seen and set(ids[1:]) <= set(seen)
+    assert client.get("/items/changes", params={"since": since, "epoch": epoch}).status_code == 200
+    params = {"since": stale["next_since"], "epoch": stale["epoch"]}
+    assert client.get("/items/changes", params=params).status_code == 410
+
+
+def run(backend):
+    with {"sqlite": sqlite_url, "postgres": postgres_url}[backend]() as url:
+        os.environ["INVENTORY_DATABASE_URL"] = url
+        app_module = load_app(tempfile.mkdtemp())
+        with TestClient(app_module.app) as client:
+            check(client)
+            check_compaction(client, app_module)
+
+
+if __name__ == "__main__":
+    failed = False
+    for backend in sys.argv[1:] or BACKENDS:
+        try:
+            run(backend)
+            print(f"{backend:>8}: ok")
+        except Skipped as e:
+            print(f"{backend:>8}: skipped ({e})")
+        except Exception as e:
+            failed = True
+            print(f"{backend:>8}: FAILED {type(e).__name__}: {e}")
+    sys.exit(1 if failed else 0)
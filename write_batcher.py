@@ -0,0 +1,117 @@
+# Group Commit for Database Writes
+# With SQLite every committed transaction costs a disk sync, so under bursty load
+# write throughput is capped by how many commits per second the disk can do.
+# `WriteBatcher` funnels writes through one background task that runs many of them
+# in a single transaction ("group commit"):
+# 1. A request calls `await batcher.submit(query, "fetch_one")` and waits.
+# 2. The writer task collects queued writes until it has `max_ops` of them or
+#    `max_delay` seconds have passed since the first one arrived.
+# 3. It runs them in one transaction, each inside its own SAVEPOINT so a failing
+#    write only fails its own request, then commits.
+# 4. Only after the commit is every waiting request given its result, so a
+#    returned ID (or 404) is always durable.
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class WriteBatcher:
+    def __init__(self, database, max_ops: int = 100, max_delay: float = 0.005):
+        self.database = database
+        self.max_ops = max_ops
+        self.max_delay = max_delay
+        self.batches = 0
+        self.operations = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Let the writer finish everything already queued, then stop it.
+        """
+        await self._queue.put(None)
+        await self._task
+
+    async def submit(self, query, method: str = "execute") -> Any:
+        """
+        Queue a write and wait until it has been committed.
+        `method` is the `databases.Database` method to run it with
+        (`execute`, `fetch_one` or `fetch_val`); its return value is passed back.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, method, future))
+        return await future
+
+    async def _collect(self):
+        """
+        Wait for the first write, then gather more until the batch is full or
+        `max_delay` has passed. Returns the batch and whether to stop afterwards.
+        """
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while len(batch) < self.max_ops:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                operation = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if operation is None:
+                return batch, True
+            batch.append(operation)
+        return batch, False
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch):
+        results = []
+        try:
+            async with self.database.transaction():
+                for query, method, future in batch:
+                    try:
+                        async with self.database.transaction():
+                            results.append((future, await getattr(self.database, method)(query), None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            # The commit itself failed, so none of the writes happened
+            logger.exception("Group commit of %d writes failed", len(batch))
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for future, result, error in results:
+            if future.done():
+                # The request was cancelled (e.g. the client went away)
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "operations": self.operations,
+            "average_batch_size": round(self.operations / self.batches, 2) if self.batches else 0,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }